@@ -6,7 +6,12 @@ Bounded Authority:
 - CANNOT: Approve refunds, modify records, bypass human review
 """
 
-from typing import Optional
+import asyncio
+import io
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final, Optional
 
 from app.models.enums import ActionStatus, Department, Priority
 from app.models.schemas import ActionResult, KnowledgeArticle, RoutingDecision, QueryResult
@@ -17,6 +22,71 @@ from app.services.interfaces import (
 )
 
 
+# SLA hours to human-readable format; module-level and read-only so the
+# per-request fast path is a single dict lookup with no MRO walk
+_SLA_DESCRIPTIONS: Final = MappingProxyType({
+    1: "within 1 hour",
+    4: "within 4 hours",
+    24: "within 1 business day",
+    48: "within 2 business days",
+    72: "within 3 business days",
+})
+
+
+# Intents that categorically have no KB coverage; skipping the search avoids
+# a full embedding + vector-index round trip for them. Status checks concern
+# an existing ticket and human requests are pure escalations — the KB corpus
+# has no articles for either, and word-overlap matching only produces
+# spurious hits (e.g. "request" matching the transcript article).
+_NO_KB_INTENTS: frozenset[str] = frozenset({
+    "ticket_status",
+    "request_followup",
+    "request_human",
+    "speak_to_person",
+})
+
+# KB search cache tuning: the KB changes slowly relative to request volume,
+# so identical (query, department) pairs can reuse results for a short window
+_KB_CACHE_TTL_SECONDS: Final = 300.0
+_KB_CACHE_MAX_ENTRIES: Final = 512
+
+# Prebuilt clarification response; only user_message varies per call, so
+# model_copy avoids re-validating the constant fields
+_CLARIFICATION_TEMPLATE: Final = ActionResult(
+    ticket_id=None,
+    ticket_url=None,
+    department=Department.IT,  # Placeholder
+    status=ActionStatus.PENDING_CLARIFICATION,
+    knowledge_articles=[],
+    estimated_response_time="pending",
+    escalated=False,
+    user_message="",
+)
+
+
+@lru_cache(maxsize=128)
+def _format_sla_slow(hours: int) -> str:
+    """Format SLA hours not covered by the lookup table (cached per value)."""
+    if hours < 24:
+        return f"within {hours} hours"
+    days = hours // 24
+    return f"within {days} business day{'s' if days > 1 else ''}"
+
+
+@lru_cache(maxsize=256)
+def _ticket_summary_for_intent(intent: str) -> str:
+    """Build the ticket summary line for an intent (cached per intent)."""
+    return f"{intent.replace('_', ' ').title()} request"
+
+
+@lru_cache(maxsize=1024)
+def _build_search_query(intent: str, entities: tuple[tuple[str, str], ...]) -> str:
+    """Build the KB search query string (cached per intent/entities pair)."""
+    terms = [intent.replace("_", " ")]
+    terms.extend(value for _, value in entities)
+    return " ".join(terms)
+
+
 class ActionAgent:
     """
     Agent responsible for executing actions.
@@ -27,14 +97,9 @@ class ActionAgent:
     - Response message generation
     """
 
-    # SLA hours to human-readable format
-    SLA_DESCRIPTIONS: dict[int, str] = {
-        1: "within 1 hour",
-        4: "within 4 hours",
-        24: "within 1 business day",
-        48: "within 2 business days",
-        72: "within 3 business days",
-    }
+    # Fixed attribute layout: skips the per-instance __dict__ and makes
+    # attribute access a C-level slot load on the hot path
+    __slots__ = ("_tickets", "_knowledge", "_llm", "_kb_cache")
 
     # Minimum relevance score to consider KB as sufficient for self-service
     # If top article has relevance >= this threshold, no ticket is created for low/medium priority
@@ -57,6 +122,8 @@ class ActionAgent:
         self._tickets = ticket_service
         self._knowledge = knowledge_service
         self._llm = llm_service
+        # TTL cache for KB search results keyed by (query, department, limit)
+        self._kb_cache: dict[tuple, tuple[float, tuple[list[KnowledgeArticle], list[dict]]]] = {}
 
     async def execute(
         self,
@@ -81,40 +148,54 @@ class ActionAgent:
         ticket_url: Optional[str] = None
         status: ActionStatus
 
-        # Search knowledge base FIRST to determine if self-service is possible
-        knowledge_articles, kb_article_contents = await self._search_knowledge_with_content(
-            query_result=query_result,
-            department=routing_decision.department,
-        )
+        # Bind hot attributes to locals once; execute touches each of these
+        # several times per request
+        department = routing_decision.department
+        escalated = routing_decision.escalate_to_human
 
-        # Determine if we should create a ticket (considering KB results)
-        should_create_ticket = self._should_create_ticket(
-            routing_decision=routing_decision,
-            knowledge_articles=knowledge_articles,
+        kb_coro = self._search_knowledge_with_content(
+            query_result=query_result,
+            department=department,
         )
 
-        if should_create_ticket:
-            # Generate ticket summary and description
-            summary = self._generate_ticket_summary(query_result)
-            description = self._generate_ticket_description(
-                query_result=query_result,
-                original_message=original_message,
+        # Escalations and high/urgent priority always get a ticket regardless
+        # of KB results, so the ticket creation can overlap the KB search.
+        # Otherwise the self-service decision needs the KB results first.
+        if escalated or routing_decision.priority in (
+            Priority.HIGH,
+            Priority.URGENT,
+        ):
+            should_create_ticket = True
+            (knowledge_articles, kb_article_contents), (ticket_id, ticket_url) = (
+                await asyncio.gather(
+                    kb_coro,
+                    self._create_ticket(
+                        query_result=query_result,
+                        routing_decision=routing_decision,
+                        student_id_hash=student_id_hash,
+                        original_message=original_message,
+                    ),
+                )
             )
+        else:
+            knowledge_articles, kb_article_contents = await kb_coro
 
-            # Create the ticket
-            ticket_id, ticket_url = await self._tickets.create_ticket(
-                department=routing_decision.department,
-                priority=routing_decision.priority,
-                summary=summary,
-                description=description,
-                student_id_hash=student_id_hash,
-                entities=query_result.entities,
+            # Determine if we should create a ticket (considering KB results)
+            should_create_ticket = self._should_create_ticket(
+                routing_decision=routing_decision,
+                knowledge_articles=knowledge_articles,
             )
 
-            if routing_decision.escalate_to_human:
-                status = ActionStatus.ESCALATED
-            else:
-                status = ActionStatus.CREATED
+            if should_create_ticket:
+                ticket_id, ticket_url = await self._create_ticket(
+                    query_result=query_result,
+                    routing_decision=routing_decision,
+                    student_id_hash=student_id_hash,
+                    original_message=original_message,
+                )
+
+        if should_create_ticket:
+            status = ActionStatus.ESCALATED if escalated else ActionStatus.CREATED
         else:
             status = ActionStatus.KB_ONLY
 
@@ -124,9 +205,9 @@ class ActionAgent:
         # Generate user-friendly response message with KB content for self-service
         user_message = await self._llm.generate_response_message(
             intent=query_result.intent,
-            department=routing_decision.department,
+            department=department,
             ticket_id=ticket_id,
-            escalated=routing_decision.escalate_to_human,
+            escalated=escalated,
             estimated_response_time=estimated_response_time,
             original_message=original_message,
             knowledge_articles=knowledge_articles,
@@ -136,11 +217,11 @@ class ActionAgent:
         return ActionResult(
             ticket_id=ticket_id,
             ticket_url=ticket_url,
-            department=routing_decision.department,
+            department=department,
             status=status,
             knowledge_articles=knowledge_articles,
             estimated_response_time=estimated_response_time,
-            escalated=routing_decision.escalate_to_human,
+            escalated=escalated,
             user_message=user_message,
         )
 
@@ -157,15 +238,31 @@ class ActionAgent:
         Returns:
             ActionResult with pending_clarification status.
         """
-        return ActionResult(
-            ticket_id=None,
-            ticket_url=None,
-            department=Department.IT,  # Placeholder
-            status=ActionStatus.PENDING_CLARIFICATION,
-            knowledge_articles=[],
-            estimated_response_time="pending",
-            escalated=False,
-            user_message=clarification_question,
+        return _CLARIFICATION_TEMPLATE.model_copy(
+            update={"user_message": clarification_question}
+        )
+
+    async def _create_ticket(
+        self,
+        query_result: QueryResult,
+        routing_decision: RoutingDecision,
+        student_id_hash: str,
+        original_message: str,
+    ) -> tuple[str, str]:
+        """Generate summary/description and create the ticket."""
+        summary = self._generate_ticket_summary(query_result)
+        description = self._generate_ticket_description(
+            query_result=query_result,
+            original_message=original_message,
+        )
+
+        return await self._tickets.create_ticket(
+            department=routing_decision.department,
+            priority=routing_decision.priority,
+            summary=summary,
+            description=description,
+            student_id_hash=student_id_hash,
+            entities=query_result.entities,
         )
 
     def _should_create_ticket(
@@ -188,29 +285,18 @@ class ActionAgent:
         Returns:
             True if a ticket should be created, False for KB-only self-service.
         """
-        # Always create ticket for escalations (human review required)
-        if routing_decision.escalate_to_human:
-            return True
-
-        # Always create ticket for high priority/urgent requests
-        if routing_decision.priority in (Priority.HIGH, Priority.URGENT):
-            return True
-
-        # For low/medium priority: check if KB can handle it
-        # If we have a highly relevant KB article, skip ticket creation
-        if knowledge_articles:
-            top_article = knowledge_articles[0]
-            if top_article.relevance_score >= self.KB_SELF_SERVICE_THRESHOLD:
-                # KB can answer this - no ticket needed (first-contact resolution)
-                return False
-
-        # No good KB match - create ticket for human follow-up
-        return True
+        # Single expression: ticket unless a highly relevant KB article can
+        # handle a non-escalated, low/medium-priority request
+        return (
+            routing_decision.escalate_to_human
+            or routing_decision.priority in (Priority.HIGH, Priority.URGENT)
+            or not knowledge_articles
+            or knowledge_articles[0].relevance_score < self.KB_SELF_SERVICE_THRESHOLD
+        )
 
     def _generate_ticket_summary(self, query_result: QueryResult) -> str:
         """Generate a brief summary for the ticket."""
-        intent_display = query_result.intent.replace("_", " ").title()
-        return f"{intent_display} request"
+        return _ticket_summary_for_intent(query_result.intent)
 
     def _generate_ticket_description(
         self,
@@ -218,29 +304,37 @@ class ActionAgent:
         original_message: str,
     ) -> str:
         """Generate ticket description without exposing raw PII."""
-        lines = [
-            f"Intent: {query_result.intent}",
-            f"Category: {query_result.intent_category.value}",
-            f"Confidence: {query_result.confidence:.2f}",
-            f"Sentiment: {query_result.sentiment.value}",
-        ]
+        # Write directly into a StringIO buffer; on the ticket-creation hot
+        # path this avoids building a list of lines plus a final join
+        buf = io.StringIO()
+        w = buf.write
+        w("Intent: ")
+        w(query_result.intent)
+        w("\nCategory: ")
+        w(query_result.intent_category.value)
+        w(f"\nConfidence: {query_result.confidence:.2f}")
+        w("\nSentiment: ")
+        w(query_result.sentiment.value)
 
         if query_result.entities:
-            entities_str = ", ".join(
-                f"{k}: {v}" for k, v in query_result.entities.items()
-            )
-            lines.append(f"Entities: {entities_str}")
+            w("\nEntities: ")
+            # List comprehension (not genexpr) lets join pre-size its result
+            w(", ".join(
+                [f"{k}: {v}" for k, v in query_result.entities.items() if v is not None]
+            ))
 
         if query_result.urgency_indicators:
-            lines.append(f"Urgency: {', '.join(query_result.urgency_indicators)}")
+            w("\nUrgency: ")
+            w(", ".join(query_result.urgency_indicators))
 
         if query_result.pii_detected:
-            lines.append("Note: PII detected in original message (not included)")
+            w("\nNote: PII detected in original message (not included)")
         else:
             # Include sanitized version of message if no PII
-            lines.append(f"User message: {original_message[:500]}")
+            w("\nUser message: ")
+            w(original_message[:500])
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     async def _search_knowledge_with_content(
         self,
@@ -248,24 +342,42 @@ class ActionAgent:
         department: Department,
     ) -> tuple[list[KnowledgeArticle], list[dict]]:
         """Search knowledge base for relevant articles with full content."""
-        # Build search query from intent and entities
-        search_terms = [query_result.intent.replace("_", " ")]
-
-        for value in query_result.entities.values():
-            if isinstance(value, str):
-                search_terms.append(value)
-
-        search_query = " ".join(search_terms)
+        # Skip the search entirely for intents the KB never covers
+        if query_result.intent in _NO_KB_INTENTS:
+            return [], []
+
+        # Build search query from intent and entities; repeated (intent,
+        # entities) pairs resolve from the cache without re-joining strings
+        entities_tuple = tuple(
+            sorted(
+                (key, value)
+                for key, value in query_result.entities.items()
+                if isinstance(value, str)
+            )
+        )
+        search_query = _build_search_query(query_result.intent, entities_tuple)
 
         # Don't filter by department for escalated requests
         dept_filter = None if department == Department.ESCALATE_TO_HUMAN else department
 
+        # Identical searches recur across users; serve recent ones from the
+        # TTL cache instead of re-running the embedding + index query
+        cache_key = (search_query, dept_filter, 3)
+        now = time.monotonic()
+        cached = self._kb_cache.get(cache_key)
+        if cached is not None and now - cached[0] < _KB_CACHE_TTL_SECONDS:
+            return cached[1]
+
         articles, contents = await self._knowledge.search_with_content(
             query=search_query,
             department=dept_filter,
             limit=3,
         )
 
+        if len(self._kb_cache) >= _KB_CACHE_MAX_ENTRIES:
+            self._kb_cache.clear()
+        self._kb_cache[cache_key] = (now, (articles, contents))
+
         return articles, contents
 
     async def _search_knowledge(
@@ -279,11 +391,8 @@ class ActionAgent:
 
     def _format_sla(self, hours: int) -> str:
         """Format SLA hours as human-readable string."""
-        if hours in self.SLA_DESCRIPTIONS:
-            return self.SLA_DESCRIPTIONS[hours]
+        cached = _SLA_DESCRIPTIONS.get(hours)
+        if cached is not None:
+            return cached
 
-        if hours < 24:
-            return f"within {hours} hours"
-        else:
-            days = hours // 24
-            return f"within {days} business day{'s' if days > 1 else ''}"
+        return _format_sla_slow(hours)
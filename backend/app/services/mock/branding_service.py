@@ -3,12 +3,28 @@ Mock branding service for testing and demo mode.
 Stores branding configuration in memory.
 """
 
+import asyncio
+import threading
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Final, Optional
 
 from app.models.schemas import BrandingConfig
 from app.services.interfaces import BrandingServiceInterface
 
+# Default branding built once at import time; rebuilding the Pydantic model
+# (plus a timezone-aware datetime.now) on every cache miss is wasted work
+_DEFAULT_BRANDING = BrandingConfig(
+    logo_url=None,
+    primary_color="#2563eb",
+    institution_name="University Support",
+    tagline="Get help with IT, registration, financial aid, and more",
+    updated_at=datetime.now(timezone.utc),
+)
+
+# Health probes hit this on every request; return one shared tuple instead of
+# allocating a fresh one per call
+_HEALTHY_RESULT: Final[tuple[bool, Optional[int], Optional[str]]] = (True, 1, None)
+
 
 class MockBrandingService(BrandingServiceInterface):
     """Mock implementation of branding service using in-memory storage."""
@@ -16,22 +32,33 @@ class MockBrandingService(BrandingServiceInterface):
     # Class-level storage to persist across requests
     _branding: Optional[BrandingConfig] = None
 
+    # Guards first initialization and updates of _branding. The asyncio lock
+    # serializes coroutines on the running loop; the thread lock protects its
+    # lazy creation (and any cross-thread access). Reads stay lock-free.
+    _init_lock: Optional[asyncio.Lock] = None
+    _thread_lock: threading.Lock = threading.Lock()
+
     @classmethod
-    def _get_default_branding(cls) -> BrandingConfig:
-        """Get default branding configuration."""
-        return BrandingConfig(
-            logo_url=None,
-            primary_color="#2563eb",
-            institution_name="University Support",
-            tagline="Get help with IT, registration, financial aid, and more",
-            updated_at=datetime.now(timezone.utc),
-        )
+    def _get_init_lock(cls) -> asyncio.Lock:
+        """Get (lazily creating) the asyncio lock bound to the current loop."""
+        if cls._init_lock is None:
+            with cls._thread_lock:
+                if cls._init_lock is None:
+                    cls._init_lock = asyncio.Lock()
+        return cls._init_lock
 
     async def get_branding(self) -> BrandingConfig:
         """Get current branding configuration."""
-        if MockBrandingService._branding is None:
-            MockBrandingService._branding = self._get_default_branding()
-        return MockBrandingService._branding
+        # Lock-free hot path: after first init this is a single attribute read
+        branding = MockBrandingService._branding
+        if branding is not None:
+            return branding
+
+        async with self._get_init_lock():
+            # Re-check under the lock: another coroutine may have initialized
+            if MockBrandingService._branding is None:
+                MockBrandingService._branding = _DEFAULT_BRANDING
+            return MockBrandingService._branding
 
     async def update_branding(
         self,
@@ -41,25 +68,35 @@ class MockBrandingService(BrandingServiceInterface):
         tagline: Optional[str] = None,
     ) -> BrandingConfig:
         """Update branding configuration. Only provided fields are updated."""
-        current = await self.get_branding()
+        async with self._get_init_lock():
+            current = MockBrandingService._branding
+            if current is None:
+                current = _DEFAULT_BRANDING
 
-        # Update only provided fields
-        updated = BrandingConfig(
-            logo_url=logo_url if logo_url is not None else current.logo_url,
-            primary_color=primary_color if primary_color is not None else current.primary_color,
-            institution_name=institution_name if institution_name is not None else current.institution_name,
-            tagline=tagline if tagline is not None else current.tagline,
-            updated_at=datetime.now(timezone.utc),
-        )
+            # Update only provided fields; model_copy skips re-validation of
+            # the untouched ones
+            changes: dict = {"updated_at": datetime.now(timezone.utc)}
+            if logo_url is not None:
+                changes["logo_url"] = logo_url
+            if primary_color is not None:
+                changes["primary_color"] = primary_color
+            if institution_name is not None:
+                changes["institution_name"] = institution_name
+            if tagline is not None:
+                changes["tagline"] = tagline
+            updated = current.model_copy(update=changes)
 
-        MockBrandingService._branding = updated
-        return updated
+            MockBrandingService._branding = updated
+            return updated
 
     async def health_check(self) -> tuple[bool, Optional[int], Optional[str]]:
         """Mock health check - always healthy."""
-        return True, 1, None
+        return _HEALTHY_RESULT
 
     @classmethod
     def reset_to_defaults(cls) -> None:
         """Reset branding to defaults (for testing)."""
         cls._branding = None
+        # Drop the asyncio lock too: it is bound to the event loop that first
+        # acquired it, and tests spin up a fresh loop per test
+        cls._init_lock = None
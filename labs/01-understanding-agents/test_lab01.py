@@ -9,6 +9,8 @@ Usage:
     python test_lab01.py [--verbose]
 """
 
+import bisect
+import functools
 import io
 import os
 import re
@@ -28,6 +30,16 @@ REQUIRED_INTENTS = ["greeting", "help", "ticket", "knowledge", "farewell", "unkn
 MIN_ACCURACY_THRESHOLD = 0.90
 MIN_EXPLANATION_WORDS = 200
 
+# Edge-case inputs: (input, description); built once so the 10 KB long-input
+# string is allocated at import time, not per run
+EDGE_CASES: tuple = (
+    ("", "empty string"),
+    ("   ", "whitespace only"),
+    ("a" * 10000, "very long input"),
+    ("Hello! 123 @#$%", "special characters"),
+    (None, "None input"),
+)
+
 # Test cases: (query, expected_intent_keywords)
 INTENT_TEST_CASES = [
     # Greetings
@@ -61,6 +73,40 @@ INTENT_TEST_CASES = [
     ("12345", ["unknown"]),
 ]
 
+# Precompiled keyword-union patterns, shared across rows with the same
+# keyword set so scoring does one C-level regex search per row
+_KW_RE_CACHE: dict[frozenset, "re.Pattern[str]"] = {}
+
+
+def _kw_re(keywords) -> "re.Pattern[str]":
+    """Get (compiling once per distinct keyword set) the union pattern."""
+    key = frozenset(keywords)
+    pattern = _KW_RE_CACHE.get(key)
+    if pattern is None:
+        pattern = re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+        _KW_RE_CACHE[key] = pattern
+    return pattern
+
+# Single case-insensitive scans for the doc checks instead of lowercasing
+# the whole file and testing substrings one by one
+_KEY_CONCEPTS_RE = re.compile(r"router|specialist|orchestrator", re.IGNORECASE)
+_DIAGRAM_RE = re.compile(r"```|\+-|->|\||Agent|──|─")
+
+# Score cutoffs: points[i] applies when the ratio is below cutoffs[i]; a
+# bisect over these replaces the if/elif ladders in the scoring methods
+_ACCURACY_CUTOFFS = (0.50, 0.70, 0.80, 0.85, 0.90, 0.95)
+_ACCURACY_POINTS = (0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+_EDGE_CUTOFFS = (0.6, 0.8)
+_EDGE_POINTS = (0.0, 1.0, 2.0)
+
+# Word counting without materializing a list of every word in the file
+_WORD_RE = re.compile(r"\S+")
+
+
+def _count_words(content: str) -> int:
+    """Count whitespace-separated words in O(1) extra memory."""
+    return sum(1 for _ in _WORD_RE.finditer(content))
+
 
 @dataclass
 class TestResult:
@@ -78,8 +124,31 @@ class TestRunner:
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
         self.results: list[TestResult] = []
+        self._out_buf: list[str] = []
         self.lab_dir = Path(__file__).parent
         self.exercises_dir = self.lab_dir / "exercises"
+        # Derived paths computed once instead of per test method
+        self.classifier_path = self.exercises_dir / "intent_classifier.py"
+        self.explanation_path = self.exercises_dir / "three_agent_explanation.md"
+        self.design_path = self.exercises_dir / "multi_agent_design.md"
+
+        # Import the student classifier once; re-importing in every test
+        # mutated sys.path repeatedly and invalidated the import caches
+        sys.path.insert(0, str(self.exercises_dir))
+        self._classifier_error: Optional[Exception] = None
+        self._classifier = None
+        self._classify = None
+        try:
+            from intent_classifier import IntentClassifier
+            self._classifier_cls = IntentClassifier
+            self._classifier = IntentClassifier()
+            # Queries overlap between test methods; memoize classifications.
+            # Edge-case tests call classify directly so odd inputs still
+            # exercise the real implementation.
+            self._classify = functools.lru_cache(maxsize=256)(self._classifier.classify)
+        except Exception as e:
+            self._classifier_cls = None
+            self._classifier_error = e
 
     def log(self, message: str):
         """Print message if verbose mode is enabled."""
@@ -87,16 +156,16 @@ class TestRunner:
             print(f"  {message}")
 
     def add_result(self, result: TestResult):
-        """Add a test result."""
+        """Add a test result, buffering its output for one batched write."""
         self.results.append(result)
         icon = "\u2705" if result.passed else "\u274c"
-        print(f"{icon} {result.name}")
+        self._out_buf.append(f"{icon} {result.name}\n")
         if result.message and (not result.passed or self.verbose):
-            print(f"   {result.message}")
+            self._out_buf.append(f"   {result.message}\n")
 
     def test_classifier_file_exists(self) -> TestResult:
         """Check if intent_classifier.py exists."""
-        classifier_path = self.exercises_dir / "intent_classifier.py"
+        classifier_path = self.classifier_path
         if classifier_path.exists():
             return TestResult(
                 name="Intent classifier file exists",
@@ -115,9 +184,7 @@ class TestRunner:
 
     def test_classifier_imports(self) -> TestResult:
         """Check if classifier can be imported."""
-        try:
-            sys.path.insert(0, str(self.exercises_dir))
-            from intent_classifier import IntentClassifier
+        if self._classifier_cls is not None:
             return TestResult(
                 name="Intent classifier imports successfully",
                 passed=True,
@@ -125,42 +192,40 @@ class TestRunner:
                 points=1.0,
                 max_points=1.0
             )
-        except ImportError as e:
-            return TestResult(
-                name="Intent classifier imports successfully",
-                passed=False,
-                message=f"Import error: {e}",
-                points=0.0,
-                max_points=1.0
-            )
-        except Exception as e:
+        error = self._classifier_error
+        prefix = "Import error" if isinstance(error, ImportError) else "Error"
+        return TestResult(
+            name="Intent classifier imports successfully",
+            passed=False,
+            message=f"{prefix}: {error}",
+            points=0.0,
+            max_points=1.0
+        )
+
+    def test_classifier_accuracy(self) -> TestResult:
+        """Test intent classifier accuracy."""
+        if self._classifier is None:
             return TestResult(
-                name="Intent classifier imports successfully",
+                name=f"Classifier accuracy >= {MIN_ACCURACY_THRESHOLD:.0%}",
                 passed=False,
-                message=f"Error: {e}",
+                message="Could not import IntentClassifier",
                 points=0.0,
-                max_points=1.0
+                max_points=6.0
             )
 
-    def test_classifier_accuracy(self) -> TestResult:
-        """Test intent classifier accuracy."""
         try:
-            sys.path.insert(0, str(self.exercises_dir))
-            from intent_classifier import IntentClassifier
-
-            classifier = IntentClassifier()
+            classify = self._classify
             correct = 0
             total = len(INTENT_TEST_CASES)
             misclassified = []
 
             for query, expected_keywords in INTENT_TEST_CASES:
                 try:
-                    result = classifier.classify(query)
+                    result = classify(query)
                     intent_value = str(result.intent.value).lower() if hasattr(result.intent, 'value') else str(result.intent).lower()
 
                     # Check if any expected keyword matches
-                    matched = any(kw in intent_value for kw in expected_keywords)
-                    if matched:
+                    if _kw_re(expected_keywords).search(intent_value):
                         correct += 1
                     else:
                         misclassified.append(f"'{query[:30]}...' -> {intent_value} (expected: {expected_keywords})")
@@ -171,18 +236,7 @@ class TestRunner:
             passed = accuracy >= MIN_ACCURACY_THRESHOLD
 
             # Calculate points: 6 points max for accuracy
-            if accuracy >= 0.95:
-                points = 6.0
-            elif accuracy >= 0.90:
-                points = 5.0
-            elif accuracy >= 0.85:
-                points = 4.0
-            elif accuracy >= 0.80:
-                points = 3.0
-            elif accuracy >= 0.70:
-                points = 2.0
-            else:
-                points = 1.0 if accuracy >= 0.50 else 0.0
+            points = _ACCURACY_POINTS[bisect.bisect_right(_ACCURACY_CUTOFFS, accuracy)]
 
             message = f"Accuracy: {accuracy:.1%} ({correct}/{total})"
             if misclassified and self.verbose:
@@ -195,14 +249,6 @@ class TestRunner:
                 points=points,
                 max_points=6.0
             )
-        except ImportError:
-            return TestResult(
-                name=f"Classifier accuracy >= {MIN_ACCURACY_THRESHOLD:.0%}",
-                passed=False,
-                message="Could not import IntentClassifier",
-                points=0.0,
-                max_points=6.0
-            )
         except Exception as e:
             return TestResult(
                 name=f"Classifier accuracy >= {MIN_ACCURACY_THRESHOLD:.0%}",
@@ -214,12 +260,17 @@ class TestRunner:
 
     def test_confidence_scoring(self) -> TestResult:
         """Test if classifier provides confidence scores."""
-        try:
-            sys.path.insert(0, str(self.exercises_dir))
-            from intent_classifier import IntentClassifier
+        if self._classifier is None:
+            return TestResult(
+                name="Confidence scoring implemented",
+                passed=False,
+                message="Could not import IntentClassifier",
+                points=0.0,
+                max_points=2.0
+            )
 
-            classifier = IntentClassifier()
-            result = classifier.classify("Hello, I need help")
+        try:
+            result = self._classify("Hello, I need help")
 
             if not hasattr(result, 'confidence'):
                 return TestResult(
@@ -256,37 +307,29 @@ class TestRunner:
                 points=2.0,
                 max_points=2.0
             )
-        except ImportError:
+        except Exception as e:
             return TestResult(
                 name="Confidence scoring implemented",
                 passed=False,
-                message="Could not import IntentClassifier",
+                message=f"Error: {e}",
                 points=0.0,
                 max_points=2.0
             )
-        except Exception as e:
+
+    def test_edge_cases(self) -> TestResult:
+        """Test handling of edge cases."""
+        if self._classifier is None:
             return TestResult(
-                name="Confidence scoring implemented",
+                name="Edge cases handled gracefully",
                 passed=False,
-                message=f"Error: {e}",
+                message="Could not import IntentClassifier",
                 points=0.0,
                 max_points=2.0
             )
 
-    def test_edge_cases(self) -> TestResult:
-        """Test handling of edge cases."""
         try:
-            sys.path.insert(0, str(self.exercises_dir))
-            from intent_classifier import IntentClassifier
-
-            classifier = IntentClassifier()
-            edge_cases = [
-                ("", "empty string"),
-                ("   ", "whitespace only"),
-                ("a" * 10000, "very long input"),
-                ("Hello! 123 @#$%", "special characters"),
-                (None, "None input"),
-            ]
+            classifier = self._classifier
+            edge_cases = EDGE_CASES
 
             handled = 0
             errors = []
@@ -303,12 +346,7 @@ class TestRunner:
 
             # Calculate points based on edge cases handled
             ratio = handled / len(edge_cases)
-            if ratio >= 0.8:
-                points = 2.0
-            elif ratio >= 0.6:
-                points = 1.0
-            else:
-                points = 0.0
+            points = _EDGE_POINTS[bisect.bisect_right(_EDGE_CUTOFFS, ratio)]
 
             passed = ratio >= 0.8
             message = f"Handled {handled}/{len(edge_cases)} edge cases"
@@ -322,14 +360,6 @@ class TestRunner:
                 points=points,
                 max_points=2.0
             )
-        except ImportError:
-            return TestResult(
-                name="Edge cases handled gracefully",
-                passed=False,
-                message="Could not import IntentClassifier",
-                points=0.0,
-                max_points=2.0
-            )
         except Exception as e:
             return TestResult(
                 name="Edge cases handled gracefully",
@@ -341,7 +371,7 @@ class TestRunner:
 
     def test_three_agent_explanation(self) -> TestResult:
         """Check if three-agent explanation document exists and is complete."""
-        explanation_path = self.exercises_dir / "three_agent_explanation.md"
+        explanation_path = self.explanation_path
 
         if not explanation_path.exists():
             return TestResult(
@@ -353,7 +383,7 @@ class TestRunner:
             )
 
         content = explanation_path.read_text(encoding='utf-8')
-        word_count = len(content.split())
+        word_count = _count_words(content)
 
         if word_count < MIN_EXPLANATION_WORDS:
             return TestResult(
@@ -364,9 +394,9 @@ class TestRunner:
                 max_points=2.0
             )
 
-        # Check for key concepts
-        key_concepts = ["router", "specialist", "orchestrator"]
-        found_concepts = [c for c in key_concepts if c.lower() in content.lower()]
+        # Check for key concepts in one case-insensitive pass
+        found = {m.group(0).lower() for m in _KEY_CONCEPTS_RE.finditer(content)}
+        found_concepts = [c for c in ("router", "specialist", "orchestrator") if c in found]
 
         if len(found_concepts) < 2:
             return TestResult(
@@ -387,7 +417,7 @@ class TestRunner:
 
     def test_multi_agent_design(self) -> TestResult:
         """Check if multi-agent design document exists."""
-        design_path = self.exercises_dir / "multi_agent_design.md"
+        design_path = self.design_path
 
         if not design_path.exists():
             return TestResult(
@@ -399,12 +429,10 @@ class TestRunner:
             )
 
         content = design_path.read_text(encoding='utf-8')
-        word_count = len(content.split())
+        word_count = _count_words(content)
 
-        # Check for diagram indicators
-        has_diagram = any(indicator in content for indicator in [
-            "```", "+-", "->", "|", "Agent", "──", "─"
-        ])
+        # Check for diagram indicators with a single scan
+        has_diagram = _DIAGRAM_RE.search(content) is not None
 
         if word_count < 100:
             return TestResult(
@@ -447,6 +475,10 @@ class TestRunner:
         self.add_result(self.test_three_agent_explanation())
         self.add_result(self.test_multi_agent_design())
 
+        # One stdout write for all buffered result lines
+        sys.stdout.write("".join(self._out_buf))
+        self._out_buf.clear()
+
         # Calculate totals
         points_earned = sum(r.points for r in self.results)
         max_points = sum(r.max_points for r in self.results)
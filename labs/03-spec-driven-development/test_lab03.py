@@ -23,6 +23,33 @@ if sys.platform == "win32":
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
 
 
+_WORD_RE = re.compile(r"\S+")
+
+
+def _word_count(text: str) -> int:
+    """Count whitespace-separated tokens without materializing a token list."""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
+def _compile_section_pattern(sections: tuple) -> "re.Pattern[str]":
+    """Build one alternation over every keyword, one named group per section.
+
+    A single linear pass over the document can then mark every section whose
+    keywords appear, instead of a separate substring scan per keyword. The
+    keywords are all lowercase, so IGNORECASE folding in the engine replaces
+    a full content.lower() copy of the haystack.
+    """
+    return re.compile(
+        "|".join(
+            "(?P<s{}>{})".format(
+                i, "|".join(re.escape(kw) for kw in keywords)
+            )
+            for i, (_name, keywords) in enumerate(sections)
+        ),
+        re.IGNORECASE,
+    )
+
+
 @dataclass
 class TestResult:
     """Result of a single test."""
@@ -36,75 +63,105 @@ class TestResult:
 class SpecAnalyzer:
     """Analyzes specification documents for completeness."""
 
-    # Required sections for a complete spec
-    SPEC_SECTIONS = [
-        ("feature name", ["feature", "name", "title"]),
-        ("description", ["description", "overview", "summary"]),
-        ("user stories", ["user stor", "as a", "i want"]),
-        ("requirements", ["requirement", "functional", "must", "shall"]),
-        ("success criteria", ["success", "criteria", "acceptance", "done"]),
-    ]
-
-    CONSTITUTION_SECTIONS = [
-        ("principles", ["principle", "value", "guideline"]),
-        ("boundaries", ["boundar", "limit", "scope"]),
-        ("prohibited", ["prohibit", "never", "must not", "forbidden"]),
-    ]
+    # Required sections for a complete spec (immutable lookup tables)
+    SPEC_SECTIONS = (
+        ("feature name", ("feature", "name", "title")),
+        ("description", ("description", "overview", "summary")),
+        ("user stories", ("user stor", "as a", "i want")),
+        ("requirements", ("requirement", "functional", "must", "shall")),
+        ("success criteria", ("success", "criteria", "acceptance", "done")),
+    )
+
+    CONSTITUTION_SECTIONS = (
+        ("principles", ("principle", "value", "guideline")),
+        ("boundaries", ("boundar", "limit", "scope")),
+        ("prohibited", ("prohibit", "never", "must not", "forbidden")),
+    )
+
+    # Per-table keyword automatons built once at class definition
+    _SPEC_SECTION_RE = _compile_section_pattern(SPEC_SECTIONS)
+    _CONST_SECTION_RE = _compile_section_pattern(CONSTITUTION_SECTIONS)
+
+    # Combined alternations, compiled once: one linear scan of the document
+    # instead of one full re.findall pass per pattern
+    _STORY_RE = re.compile(
+        r"[Aa]s a[n]?\s+\w+.*[Ii] (?:want|can)"
+        r"|\*\*User Story"
+        r"|- As a"
+        r"|\d+\.\s*As a"
+    )
+    _REQ_RE = re.compile(
+        r"(?:shall|must|should|will)\s+\w+"
+        r"|(?:FR|REQ|R)\d+"
+        r"|- The system"
+        r"|\d+\.\s*The (?:system|agent|feature)",
+        re.IGNORECASE,
+    )
 
     @staticmethod
     def count_user_stories(content: str) -> int:
         """Count user stories in content."""
         # Match patterns like "As a [user], I want [goal]"
-        patterns = [
-            r"[Aa]s a[n]?\s+\w+.*[Ii] want",
-            r"[Aa]s a[n]?\s+\w+.*[Ii] can",
-            r"\*\*User Story",
-            r"- As a",
-            r"\d+\.\s*As a",
-        ]
-        count = 0
-        for pattern in patterns:
-            count += len(re.findall(pattern, content))
+        count = sum(1 for _ in SpecAnalyzer._STORY_RE.finditer(content))
         return max(count, content.lower().count("as a "))
 
     @staticmethod
     def count_requirements(content: str) -> int:
         """Count functional requirements in content."""
-        patterns = [
-            r"(?:shall|must|should|will)\s+\w+",
-            r"(?:FR|REQ|R)\d+",
-            r"- The system",
-            r"\d+\.\s*The (?:system|agent|feature)",
-        ]
-        count = 0
-        for pattern in patterns:
-            count += len(re.findall(pattern, content, re.IGNORECASE))
+        count = sum(1 for _ in SpecAnalyzer._REQ_RE.finditer(content))
         return max(count // 2, content.lower().count("requirement"))
 
     @staticmethod
-    def check_sections(content: str, sections: list) -> tuple[list, list]:
+    def check_sections(content: str, sections: tuple) -> tuple[list, list]:
         """Check which sections are present."""
-        content_lower = content.lower()
-        found = []
-        missing = []
+        if sections is SpecAnalyzer.SPEC_SECTIONS:
+            pattern = SpecAnalyzer._SPEC_SECTION_RE
+        elif sections is SpecAnalyzer.CONSTITUTION_SECTIONS:
+            pattern = SpecAnalyzer._CONST_SECTION_RE
+        else:
+            pattern = _compile_section_pattern(sections)
 
-        for section_name, keywords in sections:
-            if any(kw in content_lower for kw in keywords):
-                found.append(section_name)
-            else:
-                missing.append(section_name)
+        # One pass over the document; stop early once every section matched
+        hit: set = set()
+        for match in pattern.finditer(content):
+            hit.add(match.lastgroup)
+            if len(hit) == len(sections):
+                break
 
+        found = [name for i, (name, _) in enumerate(sections) if f"s{i}" in hit]
+        missing = [name for i, (name, _) in enumerate(sections) if f"s{i}" not in hit]
         return found, missing
 
 
 class TestRunner:
     """Runs Lab 03 verification tests."""
 
+    # Candidate file names in priority order, and the glob patterns that
+    # identify generated code; built once rather than per lookup
+    _SPEC_LAB_NAMES = ("your-spec.md", "spec.md", "my-spec.md", "escalation-spec.md")
+    _SPEC_EXERCISE_NAMES = ("your-spec.md", "spec.md")
+    _CONST_LAB_NAMES = ("your-constitution.md", "constitution.md", "my-constitution.md")
+    _CONST_EXERCISE_NAMES = ("your-constitution.md", "constitution.md")
+    _GENERATED_PATTERNS = ("*.py", "*.ts", "*.js")
+    _EXERCISE_CODE_PATTERNS = ("escalation*.py", "*detector*.py", "*agent*.py")
+
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
         self.results: list[TestResult] = []
         self.lab_dir = Path(__file__).parent
+        self._generated_dir = self.lab_dir / "generated"
+        self._exercises_dir = self.lab_dir / "exercises"
         self.analyzer = SpecAnalyzer()
+        # Locate and read each document once: four tests consume the spec and
+        # two the constitution, so per-test re-stat/re-read/re-decode is waste
+        self._spec_path = self.find_spec_file()
+        self._spec_content = (
+            self._spec_path.read_text(encoding="utf-8") if self._spec_path else None
+        )
+        self._const_path = self.find_constitution_file()
+        self._const_content = (
+            self._const_path.read_text(encoding="utf-8") if self._const_path else None
+        )
 
     def log(self, message: str):
         """Print message if verbose mode is enabled."""
@@ -119,59 +176,57 @@ class TestRunner:
         if result.message and (not result.passed or self.verbose):
             print(f"   {result.message}")
 
+    def _find_document(
+        self, lab_names: tuple, exercise_names: tuple
+    ) -> Optional[Path]:
+        """Find the highest-priority candidate with one scandir per directory.
+
+        A single directory listing replaces one stat() per candidate, which
+        is the common all-missing case's worst cost.
+        """
+        search_dirs = (
+            (self.lab_dir, lab_names),
+            (self._exercises_dir, exercise_names),
+        )
+        for directory, names in search_dirs:
+            try:
+                present = {e.name for e in os.scandir(directory) if e.is_file()}
+            except OSError:
+                continue
+            for name in names:
+                if name in present:
+                    return directory / name
+        return None
+
     def find_spec_file(self) -> Optional[Path]:
         """Find the participant's spec file."""
-        candidates = [
-            self.lab_dir / "your-spec.md",
-            self.lab_dir / "spec.md",
-            self.lab_dir / "my-spec.md",
-            self.lab_dir / "escalation-spec.md",
-            self.lab_dir / "exercises" / "your-spec.md",
-            self.lab_dir / "exercises" / "spec.md",
-        ]
-
-        for path in candidates:
-            if path.exists():
-                return path
-        return None
+        return self._find_document(self._SPEC_LAB_NAMES, self._SPEC_EXERCISE_NAMES)
 
     def find_constitution_file(self) -> Optional[Path]:
         """Find the participant's constitution file."""
-        candidates = [
-            self.lab_dir / "your-constitution.md",
-            self.lab_dir / "constitution.md",
-            self.lab_dir / "my-constitution.md",
-            self.lab_dir / "exercises" / "your-constitution.md",
-            self.lab_dir / "exercises" / "constitution.md",
-        ]
-
-        for path in candidates:
-            if path.exists():
-                return path
-        return None
+        return self._find_document(self._CONST_LAB_NAMES, self._CONST_EXERCISE_NAMES)
 
     def find_generated_code(self) -> list[Path]:
         """Find generated code files."""
-        generated_dir = self.lab_dir / "generated"
-        code_files = []
+        # Deduplicate as we accumulate (overlapping globs can repeat paths)
+        # instead of rehashing everything into a set at the end
+        code_files: dict[Path, None] = {}
 
         # Check generated directory
-        if generated_dir.exists():
-            code_files.extend(generated_dir.glob("*.py"))
-            code_files.extend(generated_dir.glob("*.ts"))
-            code_files.extend(generated_dir.glob("*.js"))
+        if self._generated_dir.exists():
+            for pattern in self._GENERATED_PATTERNS:
+                code_files.update(dict.fromkeys(self._generated_dir.glob(pattern)))
 
         # Also check exercises directory
-        exercises_dir = self.lab_dir / "exercises"
-        if exercises_dir.exists():
-            for pattern in ["escalation*.py", "*detector*.py", "*agent*.py"]:
-                code_files.extend(exercises_dir.glob(pattern))
+        if self._exercises_dir.exists():
+            for pattern in self._EXERCISE_CODE_PATTERNS:
+                code_files.update(dict.fromkeys(self._exercises_dir.glob(pattern)))
 
-        return list(set(code_files))
+        return list(code_files)
 
     def test_spec_exists(self) -> TestResult:
         """Check if spec file exists."""
-        spec_path = self.find_spec_file()
+        spec_path = self._spec_path
 
         if spec_path is None:
             return TestResult(
@@ -182,7 +237,7 @@ class TestRunner:
                 max_points=1.0
             )
 
-        word_count = len(spec_path.read_text(encoding='utf-8').split())
+        word_count = _word_count(self._spec_content)
 
         if word_count < 100:
             return TestResult(
@@ -203,9 +258,7 @@ class TestRunner:
 
     def test_spec_has_sections(self) -> TestResult:
         """Check if spec has required sections."""
-        spec_path = self.find_spec_file()
-
-        if spec_path is None:
+        if self._spec_content is None:
             return TestResult(
                 name="Specification has required sections",
                 passed=False,
@@ -214,9 +267,8 @@ class TestRunner:
                 max_points=2.0
             )
 
-        content = spec_path.read_text(encoding='utf-8')
         found, missing = self.analyzer.check_sections(
-            content, SpecAnalyzer.SPEC_SECTIONS
+            self._spec_content, SpecAnalyzer.SPEC_SECTIONS
         )
 
         completion_ratio = len(found) / len(SpecAnalyzer.SPEC_SECTIONS)
@@ -244,9 +296,7 @@ class TestRunner:
 
     def test_spec_user_stories(self) -> TestResult:
         """Check if spec has sufficient user stories."""
-        spec_path = self.find_spec_file()
-
-        if spec_path is None:
+        if self._spec_content is None:
             return TestResult(
                 name="Specification has user stories (3+ required)",
                 passed=False,
@@ -255,8 +305,7 @@ class TestRunner:
                 max_points=1.5
             )
 
-        content = spec_path.read_text(encoding='utf-8')
-        story_count = self.analyzer.count_user_stories(content)
+        story_count = self.analyzer.count_user_stories(self._spec_content)
 
         if story_count >= 3:
             return TestResult(
@@ -285,9 +334,7 @@ class TestRunner:
 
     def test_spec_requirements(self) -> TestResult:
         """Check if spec has sufficient functional requirements."""
-        spec_path = self.find_spec_file()
-
-        if spec_path is None:
+        if self._spec_content is None:
             return TestResult(
                 name="Specification has requirements (5+ required)",
                 passed=False,
@@ -296,8 +343,7 @@ class TestRunner:
                 max_points=1.5
             )
 
-        content = spec_path.read_text(encoding='utf-8')
-        req_count = self.analyzer.count_requirements(content)
+        req_count = self.analyzer.count_requirements(self._spec_content)
 
         if req_count >= 5:
             return TestResult(
@@ -326,7 +372,7 @@ class TestRunner:
 
     def test_constitution_exists(self) -> TestResult:
         """Check if constitution file exists."""
-        const_path = self.find_constitution_file()
+        const_path = self._const_path
 
         if const_path is None:
             return TestResult(
@@ -337,7 +383,7 @@ class TestRunner:
                 max_points=1.0
             )
 
-        word_count = len(const_path.read_text(encoding='utf-8').split())
+        word_count = _word_count(self._const_content)
 
         if word_count < 50:
             return TestResult(
@@ -358,9 +404,7 @@ class TestRunner:
 
     def test_constitution_content(self) -> TestResult:
         """Check if constitution has required sections."""
-        const_path = self.find_constitution_file()
-
-        if const_path is None:
+        if self._const_content is None:
             return TestResult(
                 name="Constitution has principles and boundaries",
                 passed=False,
@@ -369,7 +413,7 @@ class TestRunner:
                 max_points=2.0
             )
 
-        content = const_path.read_text(encoding='utf-8')
+        content = self._const_content
         found, missing = self.analyzer.check_sections(
             content, SpecAnalyzer.CONSTITUTION_SECTIONS
         )
@@ -414,11 +458,12 @@ class TestRunner:
                 max_points=1.0
             )
 
-        # Analyze generated code
+        # Analyze generated code: only line counts are needed, so count raw
+        # newline bytes and skip the UTF-8 decode entirely
         total_lines = 0
         for code_file in code_files:
-            content = code_file.read_text(encoding='utf-8')
-            total_lines += len(content.splitlines())
+            data = code_file.read_bytes()
+            total_lines += data.count(b"\n") + (bool(data) and not data.endswith(b"\n"))
 
         files_list = ", ".join(f.name for f in code_files[:3])
         if len(code_files) > 3:
@@ -444,16 +489,16 @@ class TestRunner:
     def test_validation_notes(self) -> TestResult:
         """Check if validation notes exist."""
         notes_locations = [
-            self.lab_dir / "generated" / "validation_notes.md",
-            self.lab_dir / "generated" / "notes.md",
+            self._generated_dir / "validation_notes.md",
+            self._generated_dir / "notes.md",
             self.lab_dir / "validation_notes.md",
-            self.lab_dir / "exercises" / "validation_notes.md",
+            self._exercises_dir / "validation_notes.md",
         ]
 
         for notes_path in notes_locations:
             if notes_path.exists():
                 content = notes_path.read_text(encoding='utf-8')
-                word_count = len(content.split())
+                word_count = _word_count(content)
 
                 if word_count >= 30:
                     return TestResult(
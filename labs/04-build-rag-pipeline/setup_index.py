@@ -3,11 +3,16 @@ Lab 04 - Index Setup Script
 Creates the Azure AI Search index and indexes KB articles with embeddings.
 """
 
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import httpx
+import requests
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
@@ -23,6 +28,7 @@ from azure.search.documents.indexes.models import (
     SemanticField,
     SemanticPrioritizedFields,
     SemanticSearch,
+    ScalarQuantizationCompression,
 )
 from openai import AzureOpenAI
 
@@ -35,6 +41,46 @@ OPENAI_ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT")
 OPENAI_KEY = os.environ.get("AZURE_OPENAI_API_KEY")
 EMBEDDING_MODEL = "text-embedding-ada-002"
 
+# Embedding throughput tuning: the embeddings API accepts a list of inputs,
+# so articles are sent in batches and the batches issued concurrently
+EMBEDDING_BATCH_SIZE = 16
+EMBEDDING_WORKERS = 8
+
+# Azure AI Search caps upload batches around 1000 docs / 16 MB; stay well
+# under it and keep a few requests in flight instead of one giant POST
+UPLOAD_BATCH_SIZE = 500
+UPLOAD_WORKERS = 4
+
+# Token-accurate truncation when tiktoken is available: a character slice is
+# too aggressive for ASCII (wastes context) and too lax for dense non-ASCII
+# text (can exceed the model's 8192-token limit and 400 the whole batch)
+# orjson parses bytes directly with a C parser (2-5x the stdlib, no separate
+# UTF-8 decode pass); fall back to the stdlib when it isn't installed
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+EMBEDDING_TOKEN_LIMIT = 8191
+try:
+    import tiktoken
+
+    _ENCODER = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+except ImportError:
+    _ENCODER = None
+
+
+def _truncate(text: str) -> str:
+    """Clamp text to the embedding model's input limit."""
+    if _ENCODER is None:
+        return text[:8000]  # Conservative character fallback
+    tokens = _ENCODER.encode(text)
+    if len(tokens) <= EMBEDDING_TOKEN_LIMIT:
+        return text
+    return _ENCODER.decode(tokens[:EMBEDDING_TOKEN_LIMIT])
+
 def create_index(index_client: SearchIndexClient) -> None:
     """Create the search index with vector and semantic search support."""
 
@@ -61,6 +107,8 @@ def create_index(index_client: SearchIndexClient) -> None:
         ),
     ]
 
+    # Scalar quantization stores vectors as int8 server-side at ingest:
+    # 4x smaller index and HNSW graph with minimal recall loss on ada-002
     vector_search = VectorSearch(
         algorithms=[
             HnswAlgorithmConfiguration(name="my-hnsw"),
@@ -69,8 +117,12 @@ def create_index(index_client: SearchIndexClient) -> None:
             VectorSearchProfile(
                 name="my-vector-profile",
                 algorithm_configuration_name="my-hnsw",
+                compression_name="my-scalar-quantization",
             ),
         ],
+        compressions=[
+            ScalarQuantizationCompression(compression_name="my-scalar-quantization"),
+        ],
     )
 
     semantic_config = SemanticConfiguration(
@@ -97,37 +149,106 @@ def create_index(index_client: SearchIndexClient) -> None:
 
 def load_kb_articles(data_dir: Path) -> list[dict]:
     """Load all KB articles from JSON files."""
+    # Overlap the file reads in a thread pool, then parse the raw bytes;
+    # sorting keeps article (and fallback id) order deterministic
+    paths = sorted(data_dir.glob("*.json"))
+    with ThreadPoolExecutor() as executor:
+        raw = list(executor.map(Path.read_bytes, paths))
+
     articles = []
-    for file_path in data_dir.glob("*.json"):
-        with open(file_path) as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                articles.extend(data)
-            else:
-                articles.append(data)
+    for data in map(_json_loads, raw):
+        if isinstance(data, list):
+            articles.extend(data)
+        else:
+            articles.append(data)
     print(f"Loaded {len(articles)} articles from {data_dir}")
     return articles
 
 
-def generate_embedding(text: str, client: AzureOpenAI) -> list[float]:
-    """Generate embedding for text using Azure OpenAI."""
+# Embeddings are deterministic per content, so re-runs only pay API cost for
+# articles whose content actually changed. The cache lives outside the
+# working tree (alongside the other 47doors caches) so it never shows up as
+# an untracked artifact in participants' checkouts.
+EMBEDDING_CACHE_PATH = Path.home() / ".cache" / "47doors" / "embeddings_cache.jsonl"
+
+
+def _load_embedding_cache() -> dict[str, list[float]]:
+    """Load the on-disk embedding cache keyed by SHA-256 of the content."""
+    cache: dict[str, list[float]] = {}
+    try:
+        with EMBEDDING_CACHE_PATH.open("rb") as f:
+            for line in f:
+                entry = _json_loads(line)
+                cache[entry["h"]] = entry["v"]
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return cache
+
+
+def generate_embeddings(texts: list[str], client: AzureOpenAI) -> list[list[float]]:
+    """Generate embeddings for a batch of texts using Azure OpenAI."""
     response = client.embeddings.create(
         model=EMBEDDING_MODEL,
-        input=text[:8000]  # Truncate to avoid token limits
+        input=[_truncate(text) for text in texts],  # Clamp to the token limit
     )
-    return response.data[0].embedding
+    # Realign by index in case the API returns items out of order
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
 
 
 def index_documents(articles: list[dict], search_client: SearchClient, openai_client: AzureOpenAI) -> None:
     """Index KB articles with embeddings."""
-    documents = []
+    total = len(articles)
+    contents = [article.get("content", "") for article in articles]
 
-    for i, article in enumerate(articles):
-        print(f"Processing {i+1}/{len(articles)}: {article.get('title', 'Unknown')[:50]}...")
+    # Serve unchanged articles from the content-hash cache; only new or
+    # edited content goes to the API
+    hashes = [hashlib.sha256(content.encode()).hexdigest() for content in contents]
+    cache = _load_embedding_cache()
+    seen: set = set()
+    missing = []
+    for i, content_hash in enumerate(hashes):
+        if content_hash not in cache and content_hash not in seen:
+            seen.add(content_hash)
+            missing.append(i)
+
+    if missing:
+        # One API call per batch instead of one per article, with batches
+        # issued concurrently: the work is pure HTTPS latency, so wall time
+        # drops from N round-trips to roughly N / (batch size * workers).
+        # The shared client is thread-safe (httpx connection pool underneath).
+        batches = [
+            missing[i:i + EMBEDDING_BATCH_SIZE]
+            for i in range(0, len(missing), EMBEDDING_BATCH_SIZE)
+        ]
+        print(
+            f"Embedding {len(missing)}/{total} articles "
+            f"({total - len(missing)} cached) in {len(batches)} batches..."
+        )
+        with ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as executor:
+            new_embeddings = [
+                embedding
+                for batch_result in executor.map(
+                    lambda idxs: generate_embeddings(
+                        [contents[i] for i in idxs], openai_client
+                    ),
+                    batches,
+                )
+                for embedding in batch_result
+            ]
+        EMBEDDING_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with EMBEDDING_CACHE_PATH.open("a") as f:
+            for i, embedding in zip(missing, new_embeddings):
+                cache[hashes[i]] = embedding
+                f.write(json.dumps({"h": hashes[i], "v": embedding}) + "\n")
+    else:
+        print(f"All {total} embeddings served from cache")
 
-        # Generate embedding for content
-        content = article.get("content", "")
-        embedding = generate_embedding(content, openai_client)
+    embeddings = [cache[content_hash] for content_hash in hashes]
+
+    documents = []
+    for i, article in enumerate(articles):
+        content = contents[i]
+        embedding = embeddings[i]
 
         doc = {
             "id": article.get("article_id", f"kb-{i}"),
@@ -143,10 +264,18 @@ def index_documents(articles: list[dict], search_client: SearchClient, openai_cl
         }
         documents.append(doc)
 
-    # Upload in batches
+    # Upload in overlapping batches; the SDK's built-in retry policy already
+    # backs off exponentially on 429/503 per request
     print(f"\nUploading {len(documents)} documents to index...")
-    result = search_client.upload_documents(documents)
-    succeeded = sum(1 for r in result if r.succeeded)
+    upload_batches = [
+        documents[i:i + UPLOAD_BATCH_SIZE]
+        for i in range(0, len(documents), UPLOAD_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        succeeded = sum(
+            sum(1 for r in result if r.succeeded)
+            for result in executor.map(search_client.upload_documents, upload_batches)
+        )
     print(f"Successfully indexed {succeeded}/{len(documents)} documents!")
 
 
@@ -155,14 +284,23 @@ def main():
     print("Lab 04 - Azure AI Search Index Setup")
     print("=" * 60)
 
-    # Initialize clients
+    # Initialize clients. The Search clients share one requests.Session with
+    # a pool sized for the upload/embedding concurrency above (azure-core's
+    # default 10-connection pool would serialize some parallel requests), and
+    # the shared session reuses TLS handshakes across calls. Same idea for
+    # the OpenAI client via an explicitly sized httpx pool.
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32))
+    transport = RequestsTransport(session=session, session_owner=False)
+
     credential = AzureKeyCredential(SEARCH_KEY)
-    index_client = SearchIndexClient(endpoint=SEARCH_ENDPOINT, credential=credential)
-    search_client = SearchClient(endpoint=SEARCH_ENDPOINT, index_name=INDEX_NAME, credential=credential)
+    index_client = SearchIndexClient(endpoint=SEARCH_ENDPOINT, credential=credential, transport=transport)
+    search_client = SearchClient(endpoint=SEARCH_ENDPOINT, index_name=INDEX_NAME, credential=credential, transport=transport)
     openai_client = AzureOpenAI(
         azure_endpoint=OPENAI_ENDPOINT,
         api_key=OPENAI_KEY,
-        api_version="2024-02-15-preview"
+        api_version="2024-02-15-preview",
+        http_client=httpx.Client(limits=httpx.Limits(max_connections=32)),
     )
 
     # Step 1: Create index
@@ -13,13 +13,31 @@ RAG Pattern Benefits:
 - Allows the LLM to answer questions about private/recent data
 """
 
+import asyncio
 import os
+import textwrap
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
-from openai import AzureOpenAI
+import httpx
+from openai import AsyncAzureOpenAI, AzureOpenAI
 
-from search_tool import SearchResult, SearchTool
+# NumPy backs the semantic response cache; without it every query runs the
+# full pipeline (see SearchTool for the same optional-dependency handling)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from search_tool import (
+    POOL_LIMITS,
+    SearchResult,
+    SearchTool,
+    awith_retries,
+    unit_vector,
+    with_retries,
+)
 
 
 @dataclass
@@ -56,6 +74,13 @@ class RetrieveAgent:
 
     # System prompt instructs the LLM how to behave
     # Key elements: use only provided context, cite sources, admit uncertainty
+    #
+    # All static instructions live here, byte-for-byte identical across
+    # requests, so Azure OpenAI prompt caching can reuse the processed
+    # prefix: the prompt must start with a stable prefix for cache hits, and
+    # everything after the first dynamic byte (the retrieved context) is
+    # reprocessed every call. Keep this free of timestamps or other
+    # per-request content.
     DEFAULT_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on the provided context.
 
 IMPORTANT INSTRUCTIONS:
@@ -65,7 +90,14 @@ IMPORTANT INSTRUCTIONS:
 4. Be concise but thorough in your answers
 5. If multiple sources support a point, cite all of them
 
-Context chunks are numbered [1], [2], [3], etc. Reference them in your answer."""
+Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.
+Each user message contains the retrieved context under "## Retrieved Context" followed by the question under "## Question". Answer the question using only the information from that context, citing the supporting sources."""
+
+    # Response cache tuning: a query whose embedding is within this cosine
+    # similarity of a cached query (under the same filter) reuses the cached
+    # answer, skipping both the search call and the chat completion
+    _RESPONSE_CACHE_SIZE = 1024
+    _RESPONSE_CACHE_THRESHOLD = 0.95
 
     def __init__(
         self,
@@ -96,17 +128,115 @@ Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.""
             "AZURE_OPENAI_CHAT_DEPLOYMENT", "gpt-4o"
         )
 
-        # Initialize the Azure OpenAI client for chat completions
+        # Initialize the Azure OpenAI client for chat completions, with a
+        # pool sized for concurrent workloads so fan-out doesn't queue on
+        # the default connection limit or re-handshake TLS
         self.openai_client = AzureOpenAI(
             azure_endpoint=self.openai_endpoint,
             api_key=self.openai_key,
             api_version="2024-02-01",
+            http_client=httpx.Client(limits=POOL_LIMITS),
         )
 
         # Store system prompt - this defines the agent's behavior
         self.system_prompt = system_prompt or self.DEFAULT_SYSTEM_PROMPT
 
-    def _build_context(self, search_results: list[SearchResult]) -> str:
+        # Async client is created lazily so synchronous callers don't pay
+        # for a second connection pool they never use
+        self._async_client: Optional[AsyncAzureOpenAI] = None
+
+        # Semantic response cache: (unit query vector, filter, RAGResponse)
+        # tuples, evicted oldest-first by the deque's maxlen
+        self._response_cache: deque = deque(maxlen=self._RESPONSE_CACHE_SIZE)
+
+    def _ensure_async_client(self) -> None:
+        """Create the async chat client on first use."""
+        if self._async_client is None:
+            self._async_client = AsyncAzureOpenAI(
+                azure_endpoint=self.openai_endpoint,
+                api_key=self.openai_key,
+                api_version="2024-02-01",
+                http_client=httpx.AsyncClient(limits=POOL_LIMITS),
+            )
+
+    def close(self) -> None:
+        """Close this agent's connection pools, including the search tool's."""
+        self.openai_client.close()
+        self.search_tool.close()
+
+    async def aclose(self) -> None:
+        """Close the async connection pools, if they were created."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+        await self.search_tool.aclose()
+
+    @staticmethod
+    def _extract_usage(response) -> dict:
+        """Pull token usage stats out of a chat completion response."""
+        return {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+        }
+
+    @classmethod
+    def _drain_stream(cls, response) -> tuple[str, dict]:
+        """
+        Accumulate a streamed chat completion into (answer, token_usage).
+
+        With stream_options={"include_usage": True} the API appends a final
+        chunk that has no choices but carries the usage statistics.
+        """
+        parts = []
+        token_usage = {}
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            if getattr(chunk, "usage", None):
+                token_usage = cls._extract_usage(chunk)
+        return "".join(parts), token_usage
+
+    def _cached_response(
+        self, query_embedding: list[float], filter_expression: Optional[str]
+    ) -> Optional[RAGResponse]:
+        """
+        Look up a cached answer for a semantically equivalent query.
+
+        Entries under a different filter never match (the filter changes the
+        retrievable documents, so the cached answer would not be grounded in
+        the same corpus). The similarity scan is one stacked NumPy dot
+        product over the cached unit vectors; without NumPy the cache is
+        disabled and every query runs the full pipeline.
+        """
+        if np is None:
+            return None
+        entries = [e for e in self._response_cache if e[1] == filter_expression]
+        if not entries:
+            return None
+
+        similarities = np.stack([e[0] for e in entries]) @ unit_vector(query_embedding)
+        best = int(np.argmax(similarities))
+        if float(similarities[best]) >= self._RESPONSE_CACHE_THRESHOLD:
+            return entries[best][2]
+        return None
+
+    def _remember_response(
+        self,
+        query_embedding: list[float],
+        filter_expression: Optional[str],
+        response: RAGResponse,
+    ) -> None:
+        """Store an answered query in the semantic response cache."""
+        if np is None:
+            return
+        self._response_cache.append(
+            (unit_vector(query_embedding), filter_expression, response)
+        )
+
+    def _build_context(
+        self, search_results: list[SearchResult], include_scores: bool = False
+    ) -> str:
         """
         Build a formatted context string from search results.
 
@@ -114,8 +244,15 @@ Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.""
         We include metadata (like source document) to help the model understand
         where information comes from.
 
+        Relevance scores are debug metadata the model doesn't need, and at
+        ~10 prompt tokens per chunk they are billed on every single request;
+        they stay out of the prompt unless include_scores is set (the scores
+        remain available on RAGResponse.sources). The '---' separators are
+        compressed to blank lines for the same reason.
+
         Args:
             search_results: List of SearchResult objects from the search tool
+            include_scores: Put relevance scores in the context (debug only)
 
         Returns:
             Formatted string with numbered context chunks
@@ -125,17 +262,16 @@ Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.""
 
         context_parts = []
         for i, result in enumerate(search_results, start=1):
-            # Format each chunk with its number and metadata
-            # The score helps us understand relevance (useful for debugging)
+            # Format each chunk with its number and source
             source_info = result.metadata.get("source", "Unknown source")
 
-            context_parts.append(
-                f"[{i}] (Source: {source_info}, Relevance: {result.score:.3f})\n"
-                f"{result.content}"
-            )
+            if include_scores:
+                header = f"[{i}] (Source: {source_info}, Relevance: {result.score:.3f})"
+            else:
+                header = f"[{i}] Source: {source_info}"
+            context_parts.append(f"{header}\n{result.content}")
 
-        # Join with clear separators for readability
-        return "\n\n---\n\n".join(context_parts)
+        return "\n\n".join(context_parts)
 
     def _build_user_message(self, query: str, context: str) -> str:
         """
@@ -144,7 +280,9 @@ Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.""
         The structure is important:
         1. Context comes first so the model "sees" it before the question
         2. Clear separation between context and question
-        3. Explicit instruction to use citations
+        3. No static instruction text: that lives in the system prompt, so
+           the stable (cacheable) prompt prefix is as long as possible and
+           the per-request tokens are only the context and the question
 
         Args:
             query: The user's original question
@@ -159,9 +297,7 @@ Context chunks are numbered [1], [2], [3], etc. Reference them in your answer.""
 
 ## Question
 
-{query}
-
-Please answer the question using only the information from the context above. Include citations [1], [2], etc. to indicate which sources support your answer."""
+{query}"""
 
     def query(
         self,
@@ -170,6 +306,7 @@ Please answer the question using only the information from the context above. In
         temperature: float = 0.3,
         max_tokens: int = 1000,
         filter_expression: Optional[str] = None,
+        stream: bool = False,
     ) -> RAGResponse:
         """
         Execute the full RAG pipeline: retrieve context and generate response.
@@ -187,6 +324,9 @@ Please answer the question using only the information from the context above. In
             temperature: LLM temperature (lower = more focused, higher = more creative)
             max_tokens: Maximum tokens in the generated response
             filter_expression: Optional OData filter for search
+            stream: If True, stream the completion and assemble the answer
+                from chunks (same return value; use query_stream() to
+                surface partial output as it arrives)
 
         Returns:
             RAGResponse containing answer, sources, and token usage
@@ -201,6 +341,15 @@ Please answer the question using only the information from the context above. In
             for i, source in enumerate(response.sources, 1):
                 print(f"[{i}] {source.metadata.get('source')}")
         """
+        # Step 0: Check the semantic response cache. On a hit we skip the
+        # search call and the chat completion, the two expensive steps.
+        # The embedding itself is cached by SearchTool, so the follow-up
+        # lookup inside search() below costs a dict hit, not an API call.
+        query_embedding = self.search_tool.get_embedding(question)
+        cached = self._cached_response(query_embedding, filter_expression)
+        if cached is not None:
+            return cached
+
         # Step 1: Retrieve relevant documents
         # We use hybrid search for best results (vector + keyword)
         if filter_expression:
@@ -228,26 +377,222 @@ Please answer the question using only the information from the context above. In
 
         # Step 4: Call Azure OpenAI to generate the response
         # Temperature 0.3 is a good balance for factual Q&A (not too creative)
-        response = self.openai_client.chat.completions.create(
-            model=self.chat_deployment,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        if stream:
+            response = with_retries(
+                lambda: self.openai_client.chat.completions.create(
+                    model=self.chat_deployment,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+                "Chat completion",
+            )
+            answer, token_usage = self._drain_stream(response)
+        else:
+            response = with_retries(
+                lambda: self.openai_client.chat.completions.create(
+                    model=self.chat_deployment,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                ),
+                "Chat completion",
+            )
+            answer = response.choices[0].message.content
+            token_usage = self._extract_usage(response)
 
         # Step 5: Extract the answer and usage statistics
-        answer = response.choices[0].message.content
-        token_usage = {
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
-        }
-
-        return RAGResponse(
+        rag_response = RAGResponse(
             answer=answer,
             sources=search_results,
             token_usage=token_usage,
         )
+        self._remember_response(query_embedding, filter_expression, rag_response)
+        return rag_response
+
+    def query_stream(
+        self,
+        question: str,
+        top_k: int = 5,
+        temperature: float = 0.3,
+        max_tokens: int = 1000,
+        filter_expression: Optional[str] = None,
+    ):
+        """
+        Run the RAG pipeline and stream the answer as it is generated.
+
+        Yields content deltas as they arrive, so a UI can show the first
+        words after first-chunk latency instead of waiting for the whole
+        completion (often the dominant share of end-to-end latency at
+        max_tokens=1000). Total wall-clock is unchanged; perceived latency
+        drops to time-to-first-token. The completed answer is recorded in
+        the response cache exactly like query().
+
+        Yields:
+            str: The next piece of the generated answer
+        """
+        # Cache hit: the full answer already exists, yield it in one piece
+        query_embedding = self.search_tool.get_embedding(question)
+        cached = self._cached_response(query_embedding, filter_expression)
+        if cached is not None:
+            yield cached.answer
+            return
+
+        # Retrieve context and build messages, as in query()
+        if filter_expression:
+            search_results = self.search_tool.search_with_filter(
+                query=question,
+                filter_expression=filter_expression,
+                top_k=top_k,
+            )
+        else:
+            search_results = self.search_tool.search(query=question, top_k=top_k)
+        context = self._build_context(search_results)
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self._build_user_message(question, context)},
+        ]
+
+        response = with_retries(
+            lambda: self.openai_client.chat.completions.create(
+                model=self.chat_deployment,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+            ),
+            "Chat completion",
+        )
+
+        # Yield deltas as they arrive while accumulating the full answer;
+        # the final usage-only chunk has no choices
+        parts = []
+        token_usage = {}
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None):
+                token_usage = self._extract_usage(chunk)
+
+        self._remember_response(
+            query_embedding,
+            filter_expression,
+            RAGResponse(
+                answer="".join(parts),
+                sources=search_results,
+                token_usage=token_usage,
+            ),
+        )
+
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = 5,
+        temperature: float = 0.3,
+        max_tokens: int = 1000,
+        filter_expression: Optional[str] = None,
+    ) -> RAGResponse:
+        """
+        Async variant of query() for concurrent workloads.
+
+        The pipeline is pure network I/O (embedding, search, completion), so
+        awaiting each step lets an event loop keep many questions in flight
+        at once — batch evaluation or multi-user serving scales roughly
+        linearly with concurrency until Azure rate limits. Arguments and
+        return value match query().
+        """
+        self._ensure_async_client()
+
+        # Step 0: Semantic response cache, shared with the sync path
+        query_embedding = await self.search_tool.aget_embedding(question)
+        cached = self._cached_response(query_embedding, filter_expression)
+        if cached is not None:
+            return cached
+
+        # Step 1-2: Retrieve relevant documents and build context
+        search_results = await self.search_tool.asearch(
+            query=question,
+            top_k=top_k,
+            filter_expression=filter_expression,
+        )
+        context = self._build_context(search_results)
+
+        # Step 3-4: Construct the messages and generate the response
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self._build_user_message(question, context)},
+        ]
+        response = await awith_retries(
+            lambda: self._async_client.chat.completions.create(
+                model=self.chat_deployment,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ),
+            "Chat completion",
+        )
+
+        rag_response = RAGResponse(
+            answer=response.choices[0].message.content,
+            sources=search_results,
+            token_usage=self._extract_usage(response),
+        )
+        self._remember_response(query_embedding, filter_expression, rag_response)
+        return rag_response
+
+    async def aquery_many(
+        self,
+        questions: list[str],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> list[RAGResponse]:
+        """
+        Answer many questions concurrently with bounded parallelism.
+
+        A semaphore caps in-flight requests so a large batch doesn't trip
+        Azure OpenAI rate limits; within the cap, questions overlap fully.
+
+        Args:
+            questions: The questions to answer
+            concurrency: Maximum number of questions in flight at once
+            **kwargs: Forwarded to aquery() (top_k, temperature, ...)
+
+        Returns:
+            RAGResponses in the same order as the input questions
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(question: str) -> RAGResponse:
+            async with semaphore:
+                return await self.aquery(question, **kwargs)
+
+        return list(await asyncio.gather(*(_one(q) for q in questions)))
+
+    def query_many(
+        self,
+        questions: list[str],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> list[RAGResponse]:
+        """Synchronous convenience wrapper around aquery_many()."""
+
+        async def _run() -> list[RAGResponse]:
+            try:
+                return await self.aquery_many(questions, concurrency=concurrency, **kwargs)
+            finally:
+                # asyncio.run() tears down its event loop on exit, which
+                # would strand the cached async clients' keepalive
+                # connections on a dead loop and break the next call with
+                # "Event loop is closed". Close them here, inside the loop
+                # they belong to; aclose() drops the cached clients so the
+                # next run (sync or async) recreates them lazily.
+                await self.aclose()
+
+        return asyncio.run(_run())
 
     def query_with_history(
         self,
@@ -297,24 +642,20 @@ Please answer the question using only the information from the context above. In
         })
 
         # Generate response
-        response = self.openai_client.chat.completions.create(
-            model=self.chat_deployment,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        response = with_retries(
+            lambda: self.openai_client.chat.completions.create(
+                model=self.chat_deployment,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ),
+            "Chat completion",
         )
 
-        answer = response.choices[0].message.content
-        token_usage = {
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
-        }
-
         return RAGResponse(
-            answer=answer,
+            answer=response.choices[0].message.content,
             sources=search_results,
-            token_usage=token_usage,
+            token_usage=self._extract_usage(response),
         )
 
     def format_response_with_sources(self, rag_response: RAGResponse) -> str:
@@ -342,8 +683,9 @@ Please answer the question using only the information from the context above. In
         # Add numbered source list
         for i, source in enumerate(rag_response.sources, start=1):
             source_name = source.metadata.get("source", "Unknown")
-            # Truncate long content for display
-            content_preview = source.content[:150] + "..." if len(source.content) > 150 else source.content
+            # Truncate long content for display; shorten() breaks on a word
+            # boundary and avoids the slice-then-concatenate allocation
+            content_preview = textwrap.shorten(source.content, width=150, placeholder="...")
             output_parts.append(
                 f"[{i}] **{source_name}** (score: {source.score:.3f})\n"
                 f"    {content_preview}\n"
@@ -11,14 +11,158 @@ Key Concepts:
 - Hybrid search: Combines both approaches using Reciprocal Rank Fusion (RRF)
 """
 
+import asyncio
+import logging
 import os
+import random
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Optional
 
+import httpx
+import requests
+
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError, ServiceResponseError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.models import VectorizedQuery
-from openai import AzureOpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncAzureOpenAI,
+    AzureOpenAI,
+    RateLimitError,
+)
+
+# NumPy powers the semantic cache tier and MMR reranking; both degrade
+# gracefully without it (exact-match caching and Azure's server-side RRF
+# ranking still work), so it stays an optional dependency of the labs
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# HTTP pool sizing for the concurrent paths (search_many, aquery_many): the
+# SDK defaults keep around 10 connections, which serializes fan-out requests
+# and pays a fresh TLS handshake whenever the pool is exhausted
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_SEARCH_POOL_SIZE = 32
+
+# Retry policy for transient Azure failures (429 rate limits, 5xx, timeouts):
+# up to 4 attempts with exponential backoff, jittered so concurrent callers
+# don't retry in lockstep, capped at 20s per wait
+_RETRY_ATTEMPTS = 4
+_RETRY_MAX_WAIT = 20.0
+_TRANSIENT_EXCEPTIONS = (
+    RateLimitError,
+    APITimeoutError,
+    APIConnectionError,
+    HttpResponseError,
+    ServiceResponseError,
+)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """True if the failure is worth retrying (rate limit, timeout, 5xx)."""
+    status = getattr(exc, "status_code", None)
+    # Timeouts and connection errors carry no status; treat those as transient
+    return status is None or status in (429, 500, 502, 503, 504)
+
+
+def _retry_wait(exc: Exception, attempt: int) -> float:
+    """Seconds to wait before the next attempt, honoring Retry-After."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    return min(2 ** (attempt - 1) * random.uniform(0.5, 1.5), _RETRY_MAX_WAIT)
+
+
+def with_retries(call, description: str):
+    """
+    Invoke call() with exponential backoff on transient Azure failures.
+
+    Under peak load 429s and brief 5xx hiccups are expected; retrying with
+    jittered backoff (preferring the service's Retry-After hint) turns most
+    of them into slightly slower successes instead of user-visible errors.
+    Retries are logged; the final failure propagates unchanged.
+    """
+    for attempt in range(1, _RETRY_ATTEMPTS + 1):
+        try:
+            return call()
+        except _TRANSIENT_EXCEPTIONS as exc:
+            if attempt == _RETRY_ATTEMPTS or not _is_transient(exc):
+                raise
+            wait = _retry_wait(exc, attempt)
+            logger.warning(
+                "%s failed (%s); retrying in %.1fs (attempt %d/%d)",
+                description, exc, wait, attempt, _RETRY_ATTEMPTS,
+            )
+            time.sleep(wait)
+
+
+async def awith_retries(call, description: str):
+    """Async twin of with_retries(); call is an async callable."""
+    for attempt in range(1, _RETRY_ATTEMPTS + 1):
+        try:
+            return await call()
+        except _TRANSIENT_EXCEPTIONS as exc:
+            if attempt == _RETRY_ATTEMPTS or not _is_transient(exc):
+                raise
+            wait = _retry_wait(exc, attempt)
+            logger.warning(
+                "%s failed (%s); retrying in %.1fs (attempt %d/%d)",
+                description, exc, wait, attempt, _RETRY_ATTEMPTS,
+            )
+            await asyncio.sleep(wait)
+
+
+def unit_vector(embedding: list[float]) -> "np.ndarray":
+    """Return the embedding as a unit-length float32 NumPy vector."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _mmr_order(
+    query_embedding: list[float],
+    vectors: list[list[float]],
+    top_k: int,
+    lam: float,
+) -> list[int]:
+    """
+    Maximal Marginal Relevance ordering over candidate vectors.
+
+    Each step picks argmax(lam * sim_to_query - (1-lam) * redundancy),
+    where redundancy is a candidate's highest similarity to anything
+    already selected — relevant but diverse results, instead of several
+    near-identical chunks. All the similarity math is dense NumPy (one
+    matrix-vector product for the query similarities, one matrix product
+    per step for redundancy), so a few dozen candidates at 1536
+    dimensions cost microseconds. Callers must ensure NumPy is available
+    (search() falls back to RRF order without it).
+    """
+    stacked = np.stack([unit_vector(v) for v in vectors])
+    query_sims = stacked @ unit_vector(query_embedding)
+
+    selected = [int(np.argmax(query_sims))]
+    while len(selected) < min(top_k, len(vectors)):
+        redundancy = (stacked @ stacked[selected].T).max(axis=1)
+        scores = lam * query_sims - (1.0 - lam) * redundancy
+        scores[selected] = -np.inf  # Never re-pick a selected candidate
+        selected.append(int(np.argmax(scores)))
+    return selected
 
 
 @dataclass
@@ -51,6 +195,19 @@ class SearchTool:
     - Combined ranking (RRF) balances both signals
     """
 
+    # Fields projected from the index on every search. The vector field is
+    # deliberately absent: 1536 floats per result would add hundreds of KB
+    # of JSON per query that nothing downstream reads.
+    _SELECT_FIELDS = ("id", "title", "content", "snippet", "department", "category")
+    _METADATA_FIELDS = tuple(f for f in _SELECT_FIELDS if f != "content")
+
+    # Query-embedding cache tuning. Exact repeats (common in RAG follow-ups)
+    # skip the embeddings API entirely; near-duplicate queries are snapped to
+    # a recent query's vector so downstream caches see one canonical embedding.
+    _EXACT_CACHE_SIZE = 1024
+    _SEMANTIC_CACHE_SIZE = 512
+    _SEMANTIC_CACHE_THRESHOLD = 0.97
+
     def __init__(
         self,
         search_endpoint: Optional[str] = None,
@@ -85,22 +242,76 @@ class SearchTool:
             "AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002"
         )
 
-        # Initialize the Azure AI Search client
-        # The SearchClient handles connection pooling and retries automatically
+        # Initialize the Azure AI Search client on an explicitly sized
+        # requests.Session pool so concurrent searches reuse warm TLS
+        # connections instead of queueing on the transport default
+        session = requests.Session()
+        session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(
+                pool_connections=_SEARCH_POOL_SIZE, pool_maxsize=_SEARCH_POOL_SIZE
+            ),
+        )
         self.search_client = SearchClient(
             endpoint=self.search_endpoint,
             index_name=self.index_name,
             credential=AzureKeyCredential(self.search_key),
+            transport=RequestsTransport(session=session, session_owner=True),
         )
 
-        # Initialize Azure OpenAI client for generating embeddings
+        # Initialize Azure OpenAI client for generating embeddings, with a
+        # pool sized for the batched/concurrent embedding paths
         # We need embeddings to convert query text into vectors for semantic search
         self.openai_client = AzureOpenAI(
             azure_endpoint=self.openai_endpoint,
             api_key=self.openai_key,
             api_version="2024-02-01",  # Use a recent stable API version
+            http_client=httpx.Client(limits=POOL_LIMITS),
         )
 
+        # Async clients are created lazily on first asearch() call so purely
+        # synchronous callers don't pay for a second set of connection pools
+        self._async_search_client: Optional[AsyncSearchClient] = None
+        self._async_openai_client: Optional[AsyncAzureOpenAI] = None
+
+        # Two-tier query-embedding cache:
+        # - exact tier: LRU dict keyed by the normalized query string
+        # - semantic tier: recent (embedding, unit vector) pairs; a fresh
+        #   vector within _SEMANTIC_CACHE_THRESHOLD cosine similarity of one
+        #   of them is replaced by that stored vector
+        self._emb_exact: OrderedDict[str, list[float]] = OrderedDict()
+        self._emb_recent: deque = deque(maxlen=self._SEMANTIC_CACHE_SIZE)
+
+    def _ensure_async_clients(self) -> None:
+        """Create the async Azure clients on first use."""
+        if self._async_search_client is None:
+            self._async_search_client = AsyncSearchClient(
+                endpoint=self.search_endpoint,
+                index_name=self.index_name,
+                credential=AzureKeyCredential(self.search_key),
+            )
+        if self._async_openai_client is None:
+            self._async_openai_client = AsyncAzureOpenAI(
+                azure_endpoint=self.openai_endpoint,
+                api_key=self.openai_key,
+                api_version="2024-02-01",
+                http_client=httpx.AsyncClient(limits=POOL_LIMITS),
+            )
+
+    def close(self) -> None:
+        """Close the synchronous clients' connection pools."""
+        self.search_client.close()
+        self.openai_client.close()
+
+    async def aclose(self) -> None:
+        """Close the async clients' connection pools, if they were created."""
+        if self._async_search_client is not None:
+            await self._async_search_client.close()
+            self._async_search_client = None
+        if self._async_openai_client is not None:
+            await self._async_openai_client.close()
+            self._async_openai_client = None
+
     def _get_embedding(self, text: str) -> list[float]:
         """
         Generate an embedding vector for the given text.
@@ -115,12 +326,180 @@ class SearchTool:
             A list of floats representing the embedding vector
             (typically 1536 dimensions for text-embedding-ada-002)
         """
-        response = self.openai_client.embeddings.create(
-            input=text,
-            model=self.embedding_deployment,
+        key = self._cache_key(text)
+        cached = self._emb_exact.get(key)
+        if cached is not None:
+            self._emb_exact.move_to_end(key)  # Keep hot queries alive in the LRU
+            return cached
+
+        response = with_retries(
+            lambda: self.openai_client.embeddings.create(
+                input=text,
+                model=self.embedding_deployment,
+            ),
+            "Embedding request",
         )
         # The API returns a list of embeddings; we only sent one text, so take the first
-        return response.data[0].embedding
+        return self._cache_embedding(key, response.data[0].embedding)
+
+    async def _aget_embedding(self, text: str) -> list[float]:
+        """Async twin of _get_embedding, sharing the same two-tier cache."""
+        key = self._cache_key(text)
+        cached = self._emb_exact.get(key)
+        if cached is not None:
+            self._emb_exact.move_to_end(key)
+            return cached
+
+        response = await awith_retries(
+            lambda: self._async_openai_client.embeddings.create(
+                input=text,
+                model=self.embedding_deployment,
+            ),
+            "Embedding request",
+        )
+        return self._cache_embedding(key, response.data[0].embedding)
+
+    def _get_embeddings(self, texts: list[str], batch_size: int = 64) -> list[list[float]]:
+        """
+        Embed many texts with batched API calls.
+
+        The embeddings endpoint accepts a list input, so N texts cost
+        ceil(N / batch_size) round-trips instead of N. Already-cached texts
+        are skipped, and fresh vectors go through the same two-tier cache as
+        single lookups, so a later search() for any of these embeds for free.
+
+        Args:
+            texts: The texts to embed
+            batch_size: Texts per API call (returns diminish past ~64-128)
+
+        Returns:
+            Embeddings in the same order as the input texts
+        """
+        embeddings: list[Optional[list[float]]] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self._emb_exact.get(self._cache_key(text))
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                pending.append(i)
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            response = with_retries(
+                lambda batch=batch: self.openai_client.embeddings.create(
+                    input=[texts[i] for i in batch],
+                    model=self.embedding_deployment,
+                ),
+                "Batch embedding request",
+            )
+            # Realign by index in case the API returns items out of order
+            for i, item in zip(batch, sorted(response.data, key=lambda d: d.index)):
+                embeddings[i] = self._cache_embedding(self._cache_key(texts[i]), item.embedding)
+
+        return embeddings
+
+    def search_many(
+        self,
+        queries: list[str],
+        top_k: int = 5,
+        batch_size: int = 64,
+        **kwargs,
+    ) -> list[list[SearchResult]]:
+        """
+        Run many searches with batched embeddings and concurrent requests.
+
+        For N queries, the N embedding round-trips collapse into
+        ceil(N / batch_size) batched calls, and the search requests
+        themselves overlap in a thread pool (the per-query search() then
+        finds its embedding already cached).
+
+        Args:
+            queries: The search queries
+            top_k: Maximum results per query
+            batch_size: Texts per embeddings API call
+            **kwargs: Forwarded to search() (use_hybrid, field names, ...)
+
+        Returns:
+            One result list per query, in input order
+        """
+        self._get_embeddings(queries, batch_size=batch_size)
+        with ThreadPoolExecutor(max_workers=min(8, max(len(queries), 1))) as executor:
+            return list(
+                executor.map(lambda query: self.search(query, top_k=top_k, **kwargs), queries)
+            )
+
+    def get_embedding(self, text: str) -> list[float]:
+        """
+        Public access to the cached query embedding.
+
+        Lets callers (e.g. RetrieveAgent's response cache) key their own
+        caches on the same canonical vector the search pipeline uses,
+        without paying a second API call: the follow-up embedding lookup
+        inside search() is served from the exact-match tier.
+        """
+        return self._get_embedding(text)
+
+    async def aget_embedding(self, text: str) -> list[float]:
+        """Async twin of get_embedding()."""
+        self._ensure_async_clients()
+        return await self._aget_embedding(text)
+
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """Normalize a query for cache lookup (case and whitespace folded)."""
+        return " ".join(text.lower().split())
+
+    def _cache_embedding(self, key: str, embedding: list[float]) -> list[float]:
+        """
+        Record a freshly fetched embedding and return the canonical vector.
+
+        If the new vector is nearly identical (cosine >= threshold) to a
+        recently cached query's vector, that stored vector is returned
+        instead, so near-duplicate phrasings share one embedding and any
+        downstream vector-keyed cache hits on all of them. ada-002 vectors
+        are unit-length, so the whole scan is a single matrix-vector product
+        over the stacked recent vectors. Without NumPy only the exact tier
+        is maintained.
+        """
+        if np is None:
+            self._emb_exact[key] = embedding
+            if len(self._emb_exact) > self._EXACT_CACHE_SIZE:
+                self._emb_exact.popitem(last=False)
+            return embedding
+
+        unit = unit_vector(embedding)
+
+        if self._emb_recent:
+            similarities = np.stack([u for _, u in self._emb_recent]) @ unit
+            best = int(np.argmax(similarities))
+            if float(similarities[best]) >= self._SEMANTIC_CACHE_THRESHOLD:
+                embedding, unit = self._emb_recent[best]
+
+        self._emb_exact[key] = embedding
+        if len(self._emb_exact) > self._EXACT_CACHE_SIZE:
+            self._emb_exact.popitem(last=False)  # Evict the least recent query
+        self._emb_recent.append((embedding, unit))
+        return embedding
+
+    def _metadata_fields(self, content_field: str) -> tuple[str, ...]:
+        """Projected fields that belong in SearchResult.metadata."""
+        if content_field == "content":
+            return self._METADATA_FIELDS
+        return tuple(f for f in self._SELECT_FIELDS if f != content_field)
+
+    def _to_result(
+        self, result: dict, content_field: str, metadata_fields: tuple[str, ...]
+    ) -> SearchResult:
+        """Convert one raw Azure Search document into a SearchResult."""
+        # The select list is fixed, so the metadata keys are known up front;
+        # project them directly instead of filtering every returned key with
+        # per-key string checks
+        return SearchResult(
+            content=result.get(content_field, ""),
+            score=result.get("@search.score", 0.0),
+            metadata={key: result.get(key) for key in metadata_fields},
+        )
 
     def search(
         self,
@@ -129,6 +508,8 @@ class SearchTool:
         vector_field: str = "content_vector",
         content_field: str = "content",
         use_hybrid: bool = True,
+        rerank: bool = False,
+        mmr_lambda: float = 0.5,
     ) -> list[SearchResult]:
         """
         Perform hybrid search combining vector and keyword search.
@@ -145,9 +526,14 @@ class SearchTool:
             vector_field: Name of the field containing document vectors
             content_field: Name of the field containing document text
             use_hybrid: If True, use hybrid search; if False, vector-only
+            rerank: If True, fetch top_k * 2 candidates with their vectors
+                and reorder them locally with MMR for diversity
+            mmr_lambda: Relevance/diversity trade-off for the rerank
+                (1.0 = pure relevance, 0.0 = pure diversity)
 
         Returns:
             List of SearchResult objects sorted by relevance score
+            (or MMR order when rerank is set)
 
         Raises:
             azure.core.exceptions.HttpResponseError: If search service fails
@@ -166,53 +552,112 @@ class SearchTool:
                 fields=vector_field,
             )
 
-            # Step 3: Execute the search
-            # When search_text is provided alongside vector_queries, Azure performs hybrid search
-            if use_hybrid:
-                # Hybrid search: combines vector similarity with BM25 keyword matching
+            # Step 3-4: Execute the search and convert to our dataclass.
+            # When search_text is provided alongside vector_queries, Azure
+            # performs hybrid search. The SDK issues the HTTP request lazily
+            # on iteration, so the retry wrapper must cover both steps.
+            metadata_fields = self._metadata_fields(content_field)
+
+            if rerank and np is None:
+                # MMR needs NumPy; fall back to Azure's RRF order without it
+                logger.warning("rerank=True requires NumPy; returning RRF order")
+                rerank = False
+
+            select = list(self._SELECT_FIELDS)
+            top = top_k
+            if rerank:
+                # Local MMR needs the candidate vectors and extra candidates
+                # to choose from; this is the one case the vector field is
+                # allowed to cross the wire
+                select.append(vector_field)
+                top = top_k * 2
+
+            def _run() -> list[SearchResult]:
                 results = self.search_client.search(
-                    search_text=query,  # Enables keyword search component
-                    vector_queries=[vector_query],  # Enables vector search component
-                    select=["id", "title", "content", "snippet", "department", "category"],
-                    top=top_k,
-                )
-            else:
-                # Vector-only search: useful when exact keyword matches aren't important
-                results = self.search_client.search(
-                    search_text=None,
+                    # search_text enables the keyword component; None means
+                    # vector-only (useful when exact matches aren't important)
+                    search_text=query if use_hybrid else None,
                     vector_queries=[vector_query],
-                    select=["id", "title", "content", "snippet", "department", "category"],
-                    top=top_k,
+                    select=select,
+                    top=top,
                 )
+                raw = list(results)
+                converted = [self._to_result(result, content_field, metadata_fields) for result in raw]
+                if not rerank or len(converted) <= 1:
+                    return converted[:top_k]
+                vectors = [result.get(vector_field) for result in raw]
+                if any(vector is None for vector in vectors):
+                    # Documents without stored vectors can't be rescored;
+                    # keep Azure's RRF order
+                    return converted[:top_k]
+                order = _mmr_order(query_embedding, vectors, top_k, mmr_lambda)
+                return [converted[i] for i in order]
+
+            return with_retries(_run, f"Search for '{query}'")
+
+        except Exception as e:
+            # In production, you'd want more specific exception handling
+            # and proper logging. For the lab, we re-raise with context.
+            raise RuntimeError(f"Search failed for query '{query}': {e}") from e
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        vector_field: str = "content_vector",
+        content_field: str = "content",
+        use_hybrid: bool = True,
+        filter_expression: Optional[str] = None,
+    ) -> list[SearchResult]:
+        """
+        Async variant of search() for concurrent query workloads.
+
+        The pipeline is network-I/O-bound, so awaiting the embedding and
+        search calls lets one event loop overlap many in-flight queries
+        instead of serializing them. Fan out with asyncio.gather (see
+        RetrieveAgent.aquery_many for the pattern).
+
+        Args:
+            query: The user's search query in natural language
+            top_k: Maximum number of results to return (default: 5)
+            vector_field: Name of the field containing document vectors
+            content_field: Name of the field containing document text
+            use_hybrid: If True, use hybrid search; if False, vector-only
+            filter_expression: Optional OData filter applied before ranking
+
+        Returns:
+            List of SearchResult objects sorted by relevance score
+        """
+        self._ensure_async_clients()
+        try:
+            query_embedding = await self._aget_embedding(query)
+
+            vector_query = VectorizedQuery(
+                vector=query_embedding,
+                k_nearest_neighbors=top_k * 2,
+                fields=vector_field,
+            )
 
-            # Step 4: Convert Azure results to our SearchResult dataclass
-            search_results = []
-            for result in results:
-                # Extract the content and score
-                content = result.get(content_field, "")
-                score = result.get("@search.score", 0.0)
-
-                # Build metadata from remaining fields
-                # Exclude internal fields and the content we already extracted
-                metadata = {
-                    key: value
-                    for key, value in result.items()
-                    if not key.startswith("@") and key != content_field and key != vector_field
-                }
-
-                search_results.append(
-                    SearchResult(
-                        content=content,
-                        score=score,
-                        metadata=metadata,
-                    )
+            metadata_fields = self._metadata_fields(content_field)
+
+            async def _run() -> list[SearchResult]:
+                # search_text enables the keyword component, as in search();
+                # the async client returns an async iterator over result pages
+                results = await self._async_search_client.search(
+                    search_text=query if use_hybrid else None,
+                    vector_queries=[vector_query],
+                    filter=filter_expression,
+                    select=list(self._SELECT_FIELDS),
+                    top=top_k,
                 )
+                return [
+                    self._to_result(result, content_field, metadata_fields)
+                    async for result in results
+                ]
 
-            return search_results
+            return await awith_retries(_run, f"Search for '{query}'")
 
         except Exception as e:
-            # In production, you'd want more specific exception handling
-            # and proper logging. For the lab, we re-raise with context.
             raise RuntimeError(f"Search failed for query '{query}': {e}") from e
 
     def search_with_filter(
@@ -257,30 +702,21 @@ class SearchTool:
                 fields=vector_field,
             )
 
-            # The filter parameter applies OData filter syntax
-            # Filters are applied BEFORE ranking, improving performance
-            results = self.search_client.search(
-                search_text=query,
-                vector_queries=[vector_query],
-                filter=filter_expression,
-                select=["id", "title", "content", "snippet", "department", "category"],
-                top=top_k,
-            )
+            metadata_fields = self._metadata_fields(content_field)
 
-            search_results = []
-            for result in results:
-                content = result.get(content_field, "")
-                score = result.get("@search.score", 0.0)
-                metadata = {
-                    key: value
-                    for key, value in result.items()
-                    if not key.startswith("@") and key != content_field and key != vector_field
-                }
-                search_results.append(
-                    SearchResult(content=content, score=score, metadata=metadata)
+            def _run() -> list[SearchResult]:
+                # The filter parameter applies OData filter syntax
+                # Filters are applied BEFORE ranking, improving performance
+                results = self.search_client.search(
+                    search_text=query,
+                    vector_queries=[vector_query],
+                    filter=filter_expression,
+                    select=list(self._SELECT_FIELDS),
+                    top=top_k,
                 )
+                return [self._to_result(result, content_field, metadata_fields) for result in results]
 
-            return search_results
+            return with_retries(_run, f"Filtered search for '{query}'")
 
         except Exception as e:
             raise RuntimeError(f"Filtered search failed: {e}") from e